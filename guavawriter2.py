@@ -1,12 +1,47 @@
 import streamlit as st
-from youtube_transcript_api import YouTubeTranscriptApi
+from transcripts import fetch_transcript
+from youtube_urls import extract_video_id
 import anthropic
-import urllib.parse
 import re
 from pathlib import Path
 from datetime import datetime
 import httpx
 
+_SECTION_RE = re.compile(r'^##\s+', re.MULTILINE)
+# One idea per 'Idea ...:' marker, running until the next marker or the end
+_IDEA_RE = re.compile(r'^\s*Idea[^\n:]*:[ \t]*(.*?)(?=\n\s*Idea[^\n:]*:|\Z)', re.IGNORECASE | re.MULTILINE | re.DOTALL)
+_WS_RE = re.compile(r'\s+')
+
+@st.cache_resource
+def load_persona(persona_file: str = "persona.md") -> tuple:
+    """Read and split the persona file once per process into (ideation, dialogue) prompts"""
+    content = Path(persona_file).read_text()
+    # Split content into sections using markdown headers
+    sections = _SECTION_RE.split(content)[1:]
+    
+    ideation_prompt = dialogue_prompt = ""
+    for section in sections:
+        if section.startswith('Ideation'):
+            ideation_prompt = section.split('\n', 1)[1].strip()
+        elif section.startswith('Dialogue'):
+            dialogue_prompt = section.split('\n', 1)[1].strip()
+    return ideation_prompt, dialogue_prompt
+
+@st.cache_resource
+def get_anthropic_client(api_key: str):
+    """Build the Anthropic client once so its connection pool survives reruns"""
+    # Create a basic httpx client without proxies
+    http_client = httpx.Client(
+        base_url="https://api.anthropic.com",
+        timeout=httpx.Timeout(timeout=30.0)
+    )
+    
+    # Initialize Anthropic client with custom http client
+    return anthropic.Anthropic(
+        api_key=api_key,
+        http_client=http_client
+    )
+
 class PersonaManager:
     def __init__(self, persona_file: str = "persona.md"):
         self.persona_file = persona_file
@@ -17,16 +52,7 @@ class PersonaManager:
     def load_persona(self):
         """Load persona configuration from markdown file"""
         try:
-            content = Path(self.persona_file).read_text()
-            
-            # Split content into sections using markdown headers
-            sections = re.split(r'^##\s+', content, flags=re.MULTILINE)[1:]
-            
-            for section in sections:
-                if section.startswith('Ideation'):
-                    self.ideation_prompt = section.split('\n', 1)[1].strip()
-                elif section.startswith('Dialogue'):
-                    self.dialogue_prompt = section.split('\n', 1)[1].strip()
+            self.ideation_prompt, self.dialogue_prompt = load_persona(self.persona_file)
         except Exception as e:
             st.error(f"Error loading persona: {str(e)}")
             self.ideation_prompt = "Generate creative ideas"
@@ -34,17 +60,7 @@ class PersonaManager:
 
 class GuavaWriter:
     def __init__(self, api_key: str):
-        # Create a basic httpx client without proxies
-        http_client = httpx.Client(
-            base_url="https://api.anthropic.com",
-            timeout=httpx.Timeout(timeout=30.0)
-        )
-        
-        # Initialize Anthropic client with custom http client
-        self.client = anthropic.Anthropic(
-            api_key=api_key,
-            http_client=http_client
-        )
+        self.client = get_anthropic_client(api_key)
         self.persona = PersonaManager()
         
         # Initialize conversation history
@@ -53,6 +69,7 @@ class GuavaWriter:
         if 'current_context' not in st.session_state:
             st.session_state.current_context = {
                 'transcript': None,
+                'ideas': [],
                 'selected_idea': None,
                 'current_script': None,
                 'revision_history': []
@@ -60,18 +77,11 @@ class GuavaWriter:
     
     def extract_video_id(self, url: str) -> str:
         """Extract video ID from YouTube URL"""
-        query = urllib.parse.urlparse(url)
-        if query.hostname == 'youtu.be':
-            return query.path[1:]
-        if query.hostname in {'www.youtube.com', 'youtube.com'}:
-            if query.path == '/watch':
-                return urllib.parse.parse_qs(query.query)['v'][0]
-        raise ValueError(f"Invalid YouTube URL: {url}")
+        return extract_video_id(url)
 
     def get_transcript(self, video_id: str) -> str:
         """Get transcript for YouTube video"""
-        transcript_list = YouTubeTranscriptApi.get_transcript(video_id)
-        return ' '.join(entry['text'] for entry in transcript_list)
+        return fetch_transcript(video_id)
 
     def generate_ideas(self, transcript: str) -> list:
         """Generate ideas based on transcript using persona"""
@@ -100,21 +110,8 @@ class GuavaWriter:
                 temperature=0.7
             )
             
-            ideas = []
-            current_idea = None
-            
-            for line in response.completion.split('\n'):
-                if line.strip().startswith('Idea') and ':' in line:
-                    if current_idea:
-                        ideas.append(current_idea)
-                    current_idea = line.split(':', 1)[1].strip()
-                elif current_idea and line.strip():
-                    current_idea += " " + line.strip()
-            
-            if current_idea:
-                ideas.append(current_idea)
-            
-            return ideas[:3]
+            ideas = (_WS_RE.sub(' ', idea).strip() for idea in _IDEA_RE.findall(response.completion))
+            return [idea for idea in ideas if idea][:3]
             
         except Exception as e:
             st.error(f"Error in idea generation: {str(e)}")
@@ -211,13 +208,16 @@ def main():
             with st.spinner("Brainstorming... 🧠☔️"):
                 video_id = writer.extract_video_id(url)
                 transcript = writer.get_transcript(video_id)
-                st.session_state.current_context['transcript'] = transcript
                 
                 ideas = writer.generate_ideas(transcript)
                 
                 if not ideas:
                     st.error("No ideas were generated. Please try again.")
                     return
+                
+                # Only store a transcript together with its ideas, so selection never sees an empty list
+                st.session_state.current_context['transcript'] = transcript
+                st.session_state.current_context['ideas'] = ideas
                     
                 response = "I've been thinking about this piece, and I see three possibilities for a 60-second exploration:\n\n"
                 for i, idea in enumerate(ideas, 1):
@@ -230,10 +230,13 @@ def main():
             st.error(f"Error: {str(e)}")
     
     # Handle idea selection
-    if st.session_state.current_context['transcript'] and not st.session_state.current_context['selected_idea']:
-        idea_input = st.text_input("Select an idea (1-3):")
-        if idea_input and idea_input.isdigit() and 1 <= int(idea_input) <= 3:
-            ideas = writer.generate_ideas(st.session_state.current_context['transcript'])
+    ideas = st.session_state.current_context['ideas']
+    if ideas and not st.session_state.current_context['selected_idea']:
+        # A form only reruns the script on submit, not on every keystroke
+        with st.form("idea_select"):
+            idea_input = st.text_input(f"Select an idea (1-{len(ideas)}):")
+            submitted = st.form_submit_button("Select")
+        if submitted and idea_input.isdigit() and 1 <= int(idea_input) <= len(ideas):
             selected_idea = ideas[int(idea_input)-1]
             st.session_state.current_context['selected_idea'] = selected_idea
             
@@ -243,56 +246,56 @@ def main():
     
     # Handle script generation and revision
     if st.session_state.current_context['selected_idea']:
-        direction = st.text_area("Enter your thoughts or feedback:")
-        col1, col2 = st.columns([1,1])
-        
-        with col1:
-            if st.button("Generate/Update Script 🚀"):
-                with st.spinner("Working on it... 🐝"):
-                    try:
-                        current_script = st.session_state.current_context['current_script']
-                        if current_script:
-                            st.session_state.current_context['revision_history'].append((current_script, direction))
-                        
-                        new_script = writer.generate_script(
-                            st.session_state.current_context['transcript'],
-                            st.session_state.current_context['selected_idea'],
-                            direction,
-                            current_script
-                        )
-                        
-                        st.session_state.current_context['current_script'] = new_script
-                        writer.add_message("assistant", f"Here's the {'revised' if current_script else 'new'} script:\n\n{new_script}")
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"Error in script generation: {str(e)}")
+        with st.form("script_direction"):
+            direction = st.text_area("Enter your thoughts or feedback:")
+            submitted = st.form_submit_button("Generate/Update Script 🚀")
         
-        if st.session_state.current_context['current_script']:
-            with col2:
-                if st.button("Approve ✅"):
-                    st.markdown(r"""
-                    ```
-                   
-                     _   _ _____ _____ _____    _ 
-                    | \ | |_   _|  __ \_   _| | |
-                    |  \| | | | | /  \/ | |  | |
-                    | . ` | | | | |     | |  | |
-                    | |\  |_| |_| \__/\ | |  |_|
-                    \_| \_/\___/\____/  \_/  (_)
-                                                    
-                    ```
-                    """)
+        if submitted:
+            with st.spinner("Working on it... 🐝"):
+                try:
+                    current_script = st.session_state.current_context['current_script']
                     
-                    # Add download button after approval
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    filename = f"script_{timestamp}.txt"
-                    
-                    st.download_button(
-                        label="Download Approved Script 📥",
-                        data=st.session_state.current_context['current_script'],
-                        file_name=filename,
-                        mime="text/plain"
+                    new_script = writer.generate_script(
+                        st.session_state.current_context['transcript'],
+                        st.session_state.current_context['selected_idea'],
+                        direction,
+                        current_script
                     )
+                    
+                    # Record the revision only once the call has succeeded
+                    if current_script:
+                        st.session_state.current_context['revision_history'].append((current_script, direction))
+                    st.session_state.current_context['current_script'] = new_script
+                    writer.add_message("assistant", f"Here's the {'revised' if current_script else 'new'} script:\n\n{new_script}")
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Error in script generation: {str(e)}")
+        
+        if st.session_state.current_context['current_script']:
+            if st.button("Approve ✅"):
+                st.markdown(r"""
+                ```
+               
+                 _   _ _____ _____ _____    _ 
+                | \ | |_   _|  __ \_   _| | |
+                |  \| | | | | /  \/ | |  | |
+                | . ` | | | | |     | |  | |
+                | |\  |_| |_| \__/\ | |  |_|
+                \_| \_/\___/\____/  \_/  (_)
+                                                
+                ```
+                """)
+                
+                # Add download button after approval
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                filename = f"script_{timestamp}.txt"
+                
+                st.download_button(
+                    label="Download Approved Script 📥",
+                    data=st.session_state.current_context['current_script'],
+                    file_name=filename,
+                    mime="text/plain"
+                )
 
 if __name__ == "__main__":
     main()
@@ -1,10 +1,116 @@
 import streamlit as st
-from youtube_transcript_api import YouTubeTranscriptApi
+from transcripts import fetch_transcript
+from youtube_urls import extract_video_id
 import anthropic
-import urllib.parse
 import re
 from pathlib import Path
 from datetime import datetime
+import asyncio
+import random
+import time
+import httpx
+from ratelimit import TokenBucket
+
+# Abort a streamed response if no chunk arrives within this many seconds
+STREAM_STALL_TIMEOUT = 30.0
+
+# Seconds between status checks on a pending message batch
+BATCH_POLL_INTERVAL = 20
+
+# Concurrent idea requests in flight for multi-URL runs, and retries on a 429 before giving up
+IDEAS_CONCURRENCY = 8
+RATE_LIMIT_RETRIES = 5
+
+# Script models: Sonnet by default, Haiku for short revision notes, Opus on request
+SCRIPT_MODEL = "claude-3-5-sonnet-latest"
+QUICK_EDIT_MODEL = "claude-3-5-haiku-latest"
+OPUS_MODEL = "claude-3-opus-20240229"
+QUICK_EDIT_MAX_CHARS = 200
+
+# Tier 1 Anthropic budget by default, enforced before each request instead of retrying on 429.
+# Higher tiers can raise it with anthropic_rpm / anthropic_tpm in Streamlit secrets.
+ANTHROPIC_RPM = 40
+ANTHROPIC_TPM = 16000
+
+_SECTION_RE = re.compile(r'^##\s+', re.MULTILINE)
+# One idea per 'Idea ...:' marker, running until the next marker or the end
+_IDEA_RE = re.compile(r'^\s*Idea[^\n:]*:[ \t]*(.*?)(?=\n\s*Idea[^\n:]*:|\Z)', re.IGNORECASE | re.MULTILINE | re.DOTALL)
+_WS_RE = re.compile(r'\s+')
+
+@st.cache_resource
+def get_rate_limiter() -> TokenBucket:
+    """One limiter per process, since every session shares the same API budget"""
+    return TokenBucket(
+        st.secrets.get("anthropic_rpm", ANTHROPIC_RPM),
+        st.secrets.get("anthropic_tpm", ANTHROPIC_TPM)
+    )
+
+def wait_for_budget(n_tokens: int = 0):
+    """Take rate-limit budget, showing a status line whenever the request has to wait"""
+    status_text = st.empty()
+    get_rate_limiter().acquire(
+        n_tokens,
+        on_wait=lambda wait: status_text.caption(f"Pacing requests to stay under the API rate limit, waiting {wait:.0f}s...")
+    )
+    status_text.empty()
+
+def estimate_tokens(params: dict) -> int:
+    """Rough request size: about four characters per token plus the output budget"""
+    chars = 0
+    for message in params.get('messages', []):
+        content = message['content']
+        if isinstance(content, str):
+            chars += len(content)
+        else:
+            chars += sum(len(block.get('text', '')) for block in content)
+    return chars // 4 + params.get('max_tokens', 0)
+
+def stream_text(client, **params) -> str:
+    """Stream a message into the UI as it arrives and return the full text"""
+    wait_for_budget(estimate_tokens(params))
+    chunks = []
+    placeholder = st.empty()
+    # The read timeout applies between chunks, so a stalled stream fails fast
+    timeout = httpx.Timeout(60.0, read=STREAM_STALL_TIMEOUT)
+    
+    with client.messages.stream(timeout=timeout, **params) as stream:
+        for text in stream.text_stream:
+            chunks.append(text)
+            placeholder.markdown(''.join(chunks))
+    
+    return ''.join(chunks)
+
+def cached_prefix(static: str, dynamic: str) -> list:
+    """Build user content with the static prefix marked for prompt caching"""
+    if not static:
+        return [{"type": "text", "text": dynamic}]
+    return [
+        {"type": "text", "text": static, "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": dynamic}
+    ]
+
+@st.cache_resource
+def load_persona(persona_file: str = "persona.md") -> tuple:
+    """Read and split the persona file once per process into (ideation, dialogue) prompts"""
+    content = Path(persona_file).read_text()
+    sections = _SECTION_RE.split(content)[1:]
+    
+    ideation_prompt = dialogue_prompt = ""
+    for section in sections:
+        if section.startswith('Ideation'):
+            ideation_prompt = section.split('\n', 1)[1].strip()
+        elif section.startswith('Dialogue'):
+            dialogue_prompt = section.split('\n', 1)[1].strip()
+    return ideation_prompt, dialogue_prompt
+
+@st.cache_resource
+def get_anthropic_client(api_key: str):
+    """Build the Anthropic client once so its connection pool survives reruns"""
+    return anthropic.Anthropic(
+        api_key=api_key,
+        timeout=60.0,
+        default_headers={"anthropic-beta": "prompt-caching-2024-07-31"}
+    )
 
 class PersonaManager:
     def __init__(self, persona_file: str = "persona.md"):
@@ -16,14 +122,7 @@ class PersonaManager:
     def load_persona(self):
         """Load persona configuration from markdown file"""
         try:
-            content = Path(self.persona_file).read_text()
-            sections = re.split(r'^##\s+', content, flags=re.MULTILINE)[1:]
-            
-            for section in sections:
-                if section.startswith('Ideation'):
-                    self.ideation_prompt = section.split('\n', 1)[1].strip()
-                elif section.startswith('Dialogue'):
-                    self.dialogue_prompt = section.split('\n', 1)[1].strip()
+            self.ideation_prompt, self.dialogue_prompt = load_persona(self.persona_file)
         except Exception as e:
             st.error(f"Error loading persona: {str(e)}")
             self.ideation_prompt = "Generate creative ideas"
@@ -31,7 +130,7 @@ class PersonaManager:
 
 class GuavaWriter:
     def __init__(self, api_key: str):
-        self.client = anthropic.Client(api_key=api_key)
+        self.client = get_anthropic_client(api_key)
         self.persona = PersonaManager()
         
         if 'messages' not in st.session_state:
@@ -39,95 +138,186 @@ class GuavaWriter:
         if 'current_context' not in st.session_state:
             st.session_state.current_context = {
                 'transcript': None,
+                'ideas': [],
+                'idea_transcripts': [],
                 'selected_idea': None,
+                'direction': None,
                 'current_script': None,
                 'revision_history': []
             }
     
     def extract_video_id(self, url: str) -> str:
         """Extract video ID from YouTube URL"""
-        query = urllib.parse.urlparse(url)
-        if query.hostname == 'youtu.be':
-            return query.path[1:]
-        if query.hostname in {'www.youtube.com', 'youtube.com'}:
-            if query.path == '/watch':
-                return urllib.parse.parse_qs(query.query)['v'][0]
-        raise ValueError(f"Invalid YouTube URL: {url}")
+        return extract_video_id(url)
 
     def get_transcript(self, video_id: str) -> str:
         """Get transcript for YouTube video"""
-        transcript_list = YouTubeTranscriptApi.get_transcript(video_id)
-        return ' '.join(entry['text'] for entry in transcript_list)
+        return fetch_transcript(video_id)
+
+    def stream_message(self, **params) -> str:
+        """Stream a message from this writer's client into the UI"""
+        return stream_text(self.client, **params)
 
     def generate_response(self, prompt: str, context: str = "", model: str = "claude-3-sonnet-20240229") -> str:
         """Generate a response using the persona"""
-        full_prompt = f"{self.persona.dialogue_prompt}\n\nContext: {context}\n\nPrompt: {prompt}"
-        
-        response = self.client.messages.create(
+        return self.stream_message(
             model=model,
             messages=[{
                 "role": "user",
-                "content": full_prompt
+                "content": cached_prefix(self.persona.dialogue_prompt, f"Context: {context}\n\nPrompt: {prompt}")
             }],
             max_tokens=1000,
             temperature=0.7
         )
-        return response.content[0].text
+
+    def ideas_request(self, transcript: str) -> dict:
+        """Build the Messages API parameters for idea generation"""
+        # Everything except the transcript is static, so it goes first to be cached
+        instructions = f"""Having reviewed the transcript below, I'll generate three distinct creative directions to explore.
+
+Here's my perspective:
+{self.persona.ideation_prompt}
+
+I'll share three clear ideas, each formatted as:
+Idea: [idea here]
+
+Remember to focus on the core concept without restating that it's for a 60-second video."""
+        
+        return {
+            "model": "claude-3-sonnet-20240229",
+            "messages": [{
+                "role": "user",
+                "content": cached_prefix(instructions, f"The transcript to analyze:\n{transcript}")
+            }],
+            "max_tokens": 1000,
+            "temperature": 0.7
+        }
+
+    def parse_ideas(self, text: str) -> list:
+        """Parse up to three ideas from a model response"""
+        ideas = (_WS_RE.sub(' ', idea).strip() for idea in _IDEA_RE.findall(text))
+        return [idea for idea in ideas if idea][:3]
 
     def generate_ideas(self, transcript: str) -> list:
         """Generate ideas based on transcript using persona"""
         if not transcript or len(transcript.strip()) < 10:
             st.error("Transcript is too short or empty")
             return []
+        
+        try:
+            text = self.stream_message(**self.ideas_request(transcript))
+            return self.parse_ideas(text)
             
-        prompt = f"""Having reviewed this transcript, I'll generate three distinct creative directions to explore.
+        except Exception as e:
+            st.error(f"Error in idea generation: {str(e)}")
+            return []
 
-Here's my perspective:
-{self.persona.ideation_prompt}
+    async def generate_ideas_async(self, aclient, limiter: TokenBucket, transcript: str) -> list:
+        """Generate ideas for one transcript, backing off with jitter when rate limited"""
+        if not transcript or len(transcript.strip()) < 10:
+            return []
+        
+        params = self.ideas_request(transcript)
+        for attempt in range(RATE_LIMIT_RETRIES):
+            # The limiter blocks, so wait for budget off the event loop
+            await asyncio.to_thread(limiter.acquire, estimate_tokens(params))
+            try:
+                response = await aclient.messages.create(**params)
+                return self.parse_ideas(response.content[0].text)
+            except anthropic.RateLimitError:
+                if attempt == RATE_LIMIT_RETRIES - 1:
+                    raise
+                await asyncio.sleep(2 ** attempt + random.uniform(0, 1))
 
-The transcript to analyze:
-{transcript}
+    async def ideate_url_async(self, aclient, limiter: TokenBucket, semaphore: asyncio.Semaphore, url: str) -> tuple:
+        """Fetch one video's transcript and generate its ideas, returning (transcript, ideas)"""
+        # Transcript fetches run outside the semaphore, so they overlap with other videos' idea requests
+        transcript = await asyncio.to_thread(self.get_transcript, self.extract_video_id(url))
+        async with semaphore:
+            return transcript, await self.generate_ideas_async(aclient, limiter, transcript)
 
-I'll share three clear ideas, each formatted as:
-Idea: [idea here]
+    def ideate_urls(self, urls: list) -> list:
+        """Fetch transcripts and generate ideas for several URLs concurrently, returning (transcript, ideas) pairs"""
+        limiter = get_rate_limiter()
+        
+        async def run():
+            semaphore = asyncio.Semaphore(IDEAS_CONCURRENCY)
+            # Retries are handled above, and the client is scoped to this event loop
+            async with anthropic.AsyncAnthropic(
+                api_key=self.client.api_key,
+                max_retries=0,
+                default_headers={"anthropic-beta": "prompt-caching-2024-07-31"}
+            ) as aclient:
+                return await asyncio.gather(
+                    *(self.ideate_url_async(aclient, limiter, semaphore, url) for url in urls),
+                    return_exceptions=True
+                )
+        
+        sources = []
+        for url, result in zip(urls, asyncio.run(run())):
+            if isinstance(result, Exception):
+                st.error(f"Error ideating on {url}: {str(result)}")
+            else:
+                sources.append(result)
+        return sources
 
-Remember to focus on the core concept without restating that it's for a 60-second video."""
+    def submit_ideas_batch(self, transcripts: list) -> bool:
+        """Queue idea generation for several transcripts through the Message Batches API"""
+        requests = [
+            {"custom_id": str(i), "params": self.ideas_request(transcript)}
+            for i, transcript in enumerate(transcripts)
+            if transcript and len(transcript.strip()) >= 10
+        ]
+        if not requests:
+            st.error("Transcript is too short or empty")
+            return False
         
         try:
-            response = self.client.messages.create(
-                model="claude-3-sonnet-20240229",
-                messages=[{
-                    "role": "user",
-                    "content": prompt
-                }],
-                max_tokens=1000,
-                temperature=0.7
+            # Batches have their own rate limits, so only the submission call counts here
+            wait_for_budget()
+            # At the pinned SDK release, batches are only available under the beta namespace
+            batch = self.client.beta.messages.batches.create(
+                requests=requests,
+                betas=["prompt-caching-2024-07-31"]
             )
+            # Keep the ID in the session so a rerun or refresh resumes polling instead of losing the batch
+            st.session_state.pending_batch = {'id': batch.id, 'transcripts': transcripts}
+            return True
             
-            ideas = []
-            current_idea = None
-            
-            for line in response.content[0].text.split('\n'):
-                if line.strip().startswith('Idea') and ':' in line:
-                    if current_idea:
-                        ideas.append(current_idea)
-                    current_idea = line.split(':', 1)[1].strip()
-                elif current_idea and line.strip():
-                    current_idea += " " + line.strip()
-            
-            if current_idea:
-                ideas.append(current_idea)
+        except Exception as e:
+            st.error(f"Error in batch idea generation: {str(e)}")
+            return False
+
+    def collect_batch(self):
+        """Check the pending batch once, returning ideas per transcript when it has ended or None while it runs"""
+        pending = st.session_state.pending_batch
+        try:
+            batch = self.client.beta.messages.batches.retrieve(pending['id'])
+            if batch.processing_status != "ended":
+                st.info(f"Waiting on batch... {batch.request_counts.processing} request(s) still processing")
+                return None
             
-            return ideas[:3]
+            ideas = [[] for _ in pending['transcripts']]
+            for entry in self.client.beta.messages.batches.results(batch.id):
+                index = int(entry.custom_id)
+                if entry.result.type == "succeeded":
+                    ideas[index] = self.parse_ideas(entry.result.message.content[0].text)
+                elif entry.result.type == "errored":
+                    st.error(f"Batch request {index + 1} errored: {entry.result.error.error.message}")
+                else:
+                    st.error(f"Batch request {index + 1} {entry.result.type}")
             
         except Exception as e:
-            st.error(f"Error in idea generation: {str(e)}")
-            return []
+            st.error(f"Error in batch idea generation: {str(e)}")
+            ideas = [[] for _ in pending['transcripts']]
+        
+        del st.session_state.pending_batch
+        return ideas
 
-    def generate_script(self, transcript: str, idea: str, direction: str, current_script: str = None) -> str:
-        """Generate or revise script based on context"""
-        base_prompt = f"""As Clio Maar, I am creating a 60-second intimate video essay about this AI development:
-{idea}
+    def generate_script(self, transcript: str, idea: str, direction: str, revision_history: list = None, model: str = SCRIPT_MODEL) -> str:
+        """Generate or revise script, replaying each draft and its feedback as conversation turns"""
+        # The persona and guidelines stay fixed across revisions, so they form the cached prefix
+        base_prompt = f"""As Clio Maar, I am creating a 60-second intimate video essay about an AI development.
 
 My identity from persona.md:
 {self.persona.dialogue_prompt}
@@ -146,27 +336,52 @@ Format the script with timestamps and clear visual directions. For visuals, use:
 
 Remember: I'm sharing this development through my lens as an artist speaking to artists."""
 
-        if current_script and direction:
-            prompt = f"{base_prompt}\n\nCurrent script:\n{current_script}\n\nDirection for revision:\n{direction}"
-        else:
-            prompt = f"{base_prompt}\n\nContext from source:\n{transcript}\n\nDirection:\n{direction}"
+        prompt = f"The AI development:\n{idea}\n\nContext from source:\n{transcript}\n\nDirection:\n{direction}"
+        messages = [{
+            "role": "user",
+            "content": cached_prefix(base_prompt, prompt)
+        }]
         
-        response = self.client.messages.create(
-            model="claude-3-opus-20240229",
-            messages=[{
-                "role": "user",
-                "content": prompt
-            }],
+        # Later turns only append, so every earlier turn stays a cacheable prefix
+        for script, feedback in revision_history or []:
+            messages.append({"role": "assistant", "content": script})
+            messages.append({"role": "user", "content": f"Direction for revision:\n{feedback}"})
+        if revision_history:
+            messages[-1]["content"] = [{"type": "text", "text": messages[-1]["content"], "cache_control": {"type": "ephemeral"}}]
+        
+        return self.stream_message(
+            model=model,
+            messages=messages,
             max_tokens=1000,
             temperature=0.7
         )
-        
-        return response.content[0].text
 
     def add_message(self, role: str, content: str):
         """Add a message to the conversation history"""
         st.session_state.messages.append({"role": role, "content": content})
 
+def present_ideas(writer: GuavaWriter, sources: list):
+    """Store (transcript, ideas) pairs and offer every idea in the chat"""
+    ideas = [idea for _, source_ideas in sources for idea in source_ideas]
+    if not ideas:
+        st.error("No ideas were generated. Please try again.")
+        return
+    
+    # Only store transcripts together with their ideas, so selection never sees an empty list
+    st.session_state.current_context['ideas'] = ideas
+    st.session_state.current_context['idea_transcripts'] = [
+        transcript for transcript, source_ideas in sources for _ in source_ideas
+    ]
+    
+    subject = "this piece" if len(sources) == 1 else "these pieces"
+    response = f"I've been thinking about {subject}, and I see {len(ideas)} possibilities for a 60-second exploration:\n\n"
+    for i, idea in enumerate(ideas, 1):
+        response += f"{i}. {idea}\n"
+    response += "\nWhich direction speaks to you?"
+    
+    writer.add_message("assistant", response)
+    st.rerun()
+
 def main():
     st.markdown(r"""
         <style>
@@ -200,37 +415,50 @@ def main():
         </div>""", unsafe_allow_html=True)
     
     # Input components
-    url = st.text_input("Enter YouTube URL:")
-    if url and st.button("Ideate 🪄"):
+    url_input = st.text_area("Enter YouTube URLs (one per line):")
+    urls = [line.strip() for line in url_input.splitlines() if line.strip()]
+    use_batch = st.checkbox("Use batch API (50% cheaper, slower)")
+    if urls and st.button("Ideate 🪄"):
         try:
             with st.spinner("Brainstorming... 🧠☔️"):
-                video_id = writer.extract_video_id(url)
-                transcript = writer.get_transcript(video_id)
-                st.session_state.current_context['transcript'] = transcript
-                
-                ideas = writer.generate_ideas(transcript)
-                
-                if not ideas:
-                    st.error("No ideas were generated. Please try again.")
+                if use_batch:
+                    transcripts = [writer.get_transcript(writer.extract_video_id(url)) for url in urls]
+                    # Results are collected on later reruns, so the spinner never waits on the batch
+                    if writer.submit_ideas_batch(transcripts):
+                        st.rerun()
                     return
-                    
-                response = "I've been thinking about this piece, and I see three possibilities for a 60-second exploration:\n\n"
-                for i, idea in enumerate(ideas, 1):
-                    response += f"{i}. {idea}\n"
-                response += "\nWhich direction speaks to you?"
                 
-                writer.add_message("assistant", response)
-                st.rerun()
+                if len(urls) == 1:
+                    # A single video keeps the streaming path, so the ideas appear as they are written
+                    transcript = writer.get_transcript(writer.extract_video_id(urls[0]))
+                    present_ideas(writer, [(transcript, writer.generate_ideas(transcript))])
+                else:
+                    present_ideas(writer, writer.ideate_urls(urls))
         except Exception as e:
             st.error(f"Error: {str(e)}")
     
+    # Poll a submitted batch once per run, checking again after the rest of the page has drawn
+    poll_batch = False
+    if 'pending_batch' in st.session_state:
+        transcripts = st.session_state.pending_batch['transcripts']
+        batch_ideas = writer.collect_batch()
+        if batch_ideas is None:
+            poll_batch = True
+        else:
+            present_ideas(writer, list(zip(transcripts, batch_ideas)))
+    
     # Handle idea selection and script generation
-    if st.session_state.current_context['transcript'] and not st.session_state.current_context['selected_idea']:
-        idea_input = st.text_input("Select an idea (1-3):")
-        if idea_input and idea_input.isdigit() and 1 <= int(idea_input) <= 3:
-            ideas = writer.generate_ideas(st.session_state.current_context['transcript'])
+    ideas = st.session_state.current_context['ideas']
+    if ideas and not st.session_state.current_context['selected_idea']:
+        # A form only reruns the script on submit, not on every keystroke
+        with st.form("idea_select"):
+            idea_input = st.text_input(f"Select an idea (1-{len(ideas)}):")
+            submitted = st.form_submit_button("Select")
+        if submitted and idea_input.isdigit() and 1 <= int(idea_input) <= len(ideas):
             selected_idea = ideas[int(idea_input)-1]
             st.session_state.current_context['selected_idea'] = selected_idea
+            # The script is written from the transcript of the video this idea came from
+            st.session_state.current_context['transcript'] = st.session_state.current_context['idea_transcripts'][int(idea_input)-1]
             
             writer.add_message("user", f"Let's go with idea {idea_input}")
             writer.add_message("assistant", f"Great choice! What direction would you like to take with this idea?")
@@ -238,55 +466,75 @@ def main():
     
     # Handle script generation and revision
     if st.session_state.current_context['selected_idea']:
-        direction = st.text_area("Enter your thoughts or feedback:")
-        col1, col2 = st.columns([1,1])
-        
-        with col1:
-            if st.button("Generate/Update Script 🚀"):
-                with st.spinner("Working on it... 🐝"):
-                    try:
-                        current_script = st.session_state.current_context['current_script']
-                        if current_script:
-                            st.session_state.current_context['revision_history'].append((current_script, direction))
-                        
-                        new_script = writer.generate_script(
-                            st.session_state.current_context['transcript'],
-                            st.session_state.current_context['selected_idea'],
-                            direction,
-                            current_script
-                        )
-                        
-                        st.session_state.current_context['current_script'] = new_script
-                        writer.add_message("assistant", f"Here's the {'revised' if current_script else 'new'} script:\n\n{new_script}")
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"Error in script generation: {str(e)}")
+        with st.form("script_direction"):
+            direction = st.text_area("Enter your thoughts or feedback:")
+            use_opus = st.checkbox("Use Opus (slower, higher quality)")
+            submitted = st.form_submit_button("Generate/Update Script 🚀")
         
-        if st.session_state.current_context['current_script']:
-            with col2:
-                if st.button("Approve ✅"):
-                    st.markdown(r"""
-                    ```
-                   
-                     _   _ _____ _____ _____    _ 
-                    | \ | |_   _|  __ \_   _| | |
-                    |  \| | | | | /  \/ | |  | |
-                    | . ` | | | | |     | |  | |
-                    | |\  |_| |_| \__/\ | |  |_|
-                    \_| \_/\___/\____/  \_/  (_)
-                                                    
-                    ```
-                    """)
+        if submitted:
+            with st.spinner("Working on it... 🐝"):
+                try:
+                    context = st.session_state.current_context
+                    current_script = context['current_script']
+                    # Build the new history locally, so a failed call leaves the session untouched
+                    if current_script:
+                        initial_direction = context['direction']
+                        revision_history = context['revision_history'] + [(current_script, direction)]
+                    else:
+                        initial_direction = direction
+                        revision_history = []
                     
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    filename = f"script_{timestamp}.txt"
+                    if use_opus:
+                        model = OPUS_MODEL
+                    elif current_script and len(direction) < QUICK_EDIT_MAX_CHARS:
+                        model = QUICK_EDIT_MODEL
+                    else:
+                        model = SCRIPT_MODEL
                     
-                    st.download_button(
-                        label="Download Approved Script 📥",
-                        data=st.session_state.current_context['current_script'],
-                        file_name=filename,
-                        mime="text/plain"
+                    new_script = writer.generate_script(
+                        context['transcript'],
+                        context['selected_idea'],
+                        initial_direction,
+                        revision_history,
+                        model
                     )
+                    
+                    context['direction'] = initial_direction
+                    context['revision_history'] = revision_history
+                    context['current_script'] = new_script
+                    writer.add_message("assistant", f"Here's the {'revised' if current_script else 'new'} script:\n\n{new_script}")
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Error in script generation: {str(e)}")
+        
+        if st.session_state.current_context['current_script']:
+            if st.button("Approve ✅"):
+                st.markdown(r"""
+                ```
+               
+                 _   _ _____ _____ _____    _ 
+                | \ | |_   _|  __ \_   _| | |
+                |  \| | | | | /  \/ | |  | |
+                | . ` | | | | |     | |  | |
+                | |\  |_| |_| \__/\ | |  |_|
+                \_| \_/\___/\____/  \_/  (_)
+                                                
+                ```
+                """)
+                
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                filename = f"script_{timestamp}.txt"
+                
+                st.download_button(
+                    label="Download Approved Script 📥",
+                    data=st.session_state.current_context['current_script'],
+                    file_name=filename,
+                    mime="text/plain"
+                )
+    
+    if poll_batch:
+        time.sleep(BATCH_POLL_INTERVAL)
+        st.rerun()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,49 @@
+import threading
+import time
+
+class TokenBucket:
+    """Proactive limiter that waits for request and token budget before a call is made"""
+    def __init__(self, capacity_rpm: int, capacity_tpm: int = None):
+        self.capacity_rpm = capacity_rpm
+        self.capacity_tpm = capacity_tpm
+        self.requests = float(capacity_rpm)
+        self.tokens = float(capacity_tpm or 0)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        """Top up both buckets for the time elapsed since the last check"""
+        now = time.monotonic()
+        elapsed = now - self.updated
+        self.updated = now
+        self.requests = min(self.capacity_rpm, self.requests + elapsed * self.capacity_rpm / 60)
+        if self.capacity_tpm:
+            self.tokens = min(self.capacity_tpm, self.tokens + elapsed * self.capacity_tpm / 60)
+
+    def _reserve(self, n_tokens: int) -> float:
+        """Take budget and return 0 if it is available, otherwise return seconds to wait"""
+        with self.lock:
+            self._refill()
+            # A single request larger than the whole bucket would otherwise wait forever
+            n_tokens = min(n_tokens, self.capacity_tpm) if self.capacity_tpm else 0
+
+            wait = 0.0
+            if self.requests < 1:
+                wait = (1 - self.requests) * 60 / self.capacity_rpm
+            if self.tokens < n_tokens:
+                wait = max(wait, (n_tokens - self.tokens) * 60 / self.capacity_tpm)
+
+            if wait == 0:
+                self.requests -= 1
+                self.tokens -= n_tokens
+            return wait
+
+    def acquire(self, n_tokens: int = 0, on_wait=None):
+        """Block the calling thread until one request and n_tokens fit in the budget"""
+        while True:
+            wait = self._reserve(n_tokens)
+            if wait == 0:
+                return
+            if on_wait:
+                on_wait(wait)
+            time.sleep(wait)
@@ -1,25 +1,58 @@
 import streamlit as st
 from googleapiclient.discovery import build
-from youtube_transcript_api import YouTubeTranscriptApi
 import pandas as pd
 import html
+import io
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from ratelimit import TokenBucket
+from transcripts import fetch_transcript
+
+# Transcript fetches are I/O-bound, so threads overlap the network waits
+TRANSCRIPT_WORKERS = 12
+
+# YouTube allows Shorts up to three minutes long
+SHORTS_MAX_SECONDS = 180
+
+# Pace YouTube calls up front rather than hitting 429s mid-run; override with youtube_rpm in secrets
+YOUTUBE_RPM = 120
+
+TRANSCRIPT_UNAVAILABLE = "Transcript unavailable"
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_WS_RE = re.compile(r'\s+')
+_UNSAFE_FILENAME_RE = re.compile(r'[^\w\-_]')
+# Title tags that mark Shorts with no speech to transcribe
+_NO_SPEECH_RE = re.compile(r'#(?:music|dance|nospeech|instrumental|montage)\b', re.IGNORECASE)
+_DURATION_RE = re.compile(r'P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?')
 
 # Initialize YouTube API
 @st.cache_data
 def get_api_key():
     return st.secrets["youtube_api_key"]
 
+@st.cache_resource
+def get_rate_limiter():
+    """One limiter per process, shared by the Data API and transcript fetches"""
+    return TokenBucket(st.secrets.get("youtube_rpm", YOUTUBE_RPM))
+
 def get_youtube_client():
-    api_key = get_api_key()
-    return build('youtube', 'v3', developerKey=api_key)
+    """Build the YouTube client once per session instead of on every rerun"""
+    # The client wraps an httplib2 connection, which is not thread-safe, so sessions don't share one
+    if 'youtube_client' not in st.session_state:
+        api_key = get_api_key()
+        st.session_state.youtube_client = build('youtube', 'v3', developerKey=api_key, cache_discovery=False)
+    return st.session_state.youtube_client
 
-def get_channel_info(youtube, channel_id):
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_channel_info(channel_id):
     """Get channel details including profile image and description"""
+    youtube = get_youtube_client()
     request = youtube.channels().list(
         part="snippet,brandingSettings",
         id=channel_id
     )
+    get_rate_limiter().acquire()
     response = request.execute()
     
     if response['items']:
@@ -31,18 +64,21 @@ def get_channel_info(youtube, channel_id):
         }
     return None
 
-def get_channel_id(youtube, channel_url):
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_channel_id(channel_url):
     """Extract channel ID from URL and verify it exists"""
     if 'youtube.com/channel/' in channel_url:
         channel_id = channel_url.split('youtube.com/channel/')[1].split('/')[0]
     elif 'youtube.com/@' in channel_url:
         handle = channel_url.split('youtube.com/@')[1].split('/')[0]
+        youtube = get_youtube_client()
         request = youtube.search().list(
             part="snippet",
             q=handle,
             type="channel",
             maxResults=1
         )
+        get_rate_limiter().acquire()
         response = request.execute()
         if response['items']:
             channel_id = response['items'][0]['snippet']['channelId']
@@ -52,23 +88,26 @@ def get_channel_id(youtube, channel_url):
         raise ValueError("Invalid channel URL format")
     return channel_id
 
-def extract_hashtags(text):
-    """Extract hashtags from text"""
-    hashtags = re.findall(r'#\w+', text)
-    return ' '.join(hashtags)
+def split_hashtags(text):
+    """Clean text and split it into (text without hashtags, hashtags) in one pass"""
+    words, hashtags = [], []
+    for word in clean_text(text).split():
+        (hashtags if word.startswith('#') else words).append(word)
+    return ' '.join(words), ' '.join(hashtags)
 
 def clean_text(text):
     """Clean text by removing HTML entities and special characters"""
     # First decode HTML entities
     text = html.unescape(text)
     # Remove any remaining HTML tags
-    text = re.sub(r'<[^>]+>', '', text)
+    text = _TAG_RE.sub('', text)
     # Remove extra whitespace
-    text = ' '.join(text.split())
-    return text
+    return _WS_RE.sub(' ', text).strip()
 
-def get_recent_shorts(youtube, channel_id, max_results=50):
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_recent_shorts(channel_id, max_results=50):
     """Get most recent Shorts from channel"""
+    youtube = get_youtube_client()
     request = youtube.search().list(
         part="snippet",
         channelId=channel_id,
@@ -76,15 +115,44 @@ def get_recent_shorts(youtube, channel_id, max_results=50):
         type="video",
         videoDuration="short"
     )
+    get_rate_limiter().acquire()
     return request.execute()
 
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_video_details(video_ids):
+    """Get contentDetails for up to 50 videos in a single request"""
+    if not video_ids:
+        return {}
+    youtube = get_youtube_client()
+    request = youtube.videos().list(
+        part="contentDetails",
+        id=','.join(video_ids)
+    )
+    get_rate_limiter().acquire()
+    response = request.execute()
+    return {item['id']: item['contentDetails'] for item in response['items']}
+
+def parse_duration(duration):
+    """Convert an ISO 8601 duration such as PT1M5S to seconds, or None if it can't be parsed"""
+    match = _DURATION_RE.fullmatch(duration)
+    if not match:
+        return None
+    days, hours, minutes, seconds = (int(part or 0) for part in match.groups())
+    return ((days * 24 + hours) * 60 + minutes) * 60 + seconds
+
 def get_transcript(video_id):
     """Get transcript for a video"""
     try:
-        transcript = YouTubeTranscriptApi.get_transcript(video_id)
-        return ' '.join(segment['text'] for segment in transcript)
+        return fetch_transcript(video_id, limiter=get_rate_limiter())
     except:
-        return "Transcript unavailable"
+        return TRANSCRIPT_UNAVAILABLE
+
+def needs_transcript(item, content_details):
+    """Decide whether a Short is worth a transcript round-trip"""
+    # The caption flag only covers uploaded captions, so auto-captioned videos still need the title check
+    if content_details.get('caption') == 'true':
+        return True
+    return not _NO_SPEECH_RE.search(item['snippet']['title'])
 
 def main():
     st.title("ShortsPuller")
@@ -98,11 +166,10 @@ def main():
     
     if channel_url:
         try:
-            youtube = get_youtube_client()
-            channel_id = get_channel_id(youtube, channel_url)
+            channel_id = get_channel_id(channel_url)
             
             # Get channel info
-            channel_info = get_channel_info(youtube, channel_id)
+            channel_info = get_channel_info(channel_id)
             if channel_info:
                 st.image(channel_info['profile_image'], width=100)
                 st.write(f"Channel: {channel_info['name']}")
@@ -114,42 +181,56 @@ def main():
             status_text = st.empty()
 
             with st.spinner("Fetching Shorts list..."):
-                shorts_response = get_recent_shorts(youtube, channel_id, max_shorts)
+                shorts_response = get_recent_shorts(channel_id, max_shorts)
+                # search.list only filters to under four minutes, so check real durations in one batched call
+                details = get_video_details([item['id']['videoId'] for item in shorts_response['items']])
+                durations = {
+                    video_id: parse_duration(content_details['duration'])
+                    for video_id, content_details in details.items()
+                }
+                # Live and upcoming videos report P0D, and unparseable durations come back as None
+                items = [
+                    item for item in shorts_response['items']
+                    if durations.get(item['id']['videoId'])
+                    and durations[item['id']['videoId']] <= SHORTS_MAX_SECONDS
+                ]
+            
+            if not items:
+                st.warning("No Shorts found for this channel.")
+                return
             
-            total_shorts = len(shorts_response['items'])
-            results = []
+            total_shorts = len(items)
+            video_ids = [item['id']['videoId'] for item in items]
+            transcripts = [TRANSCRIPT_UNAVAILABLE] * total_shorts
+            to_fetch = [idx for idx, item in enumerate(items) if needs_transcript(item, details[video_ids[idx]])]
             
-            for idx, item in enumerate(shorts_response['items']):
-                # Update progress
-                progress = int((idx + 1) * 100 / total_shorts)
-                progress_bar.progress(progress)
-                status_text.text(f"Processing video {idx + 1} of {total_shorts}...")
-                
-                video_id = item['id']['videoId']
-                title_raw = item['snippet']['title']
-                title = clean_text(title_raw)
-                hashtags = extract_hashtags(title)
-                title_without_hashtags = ' '.join(word for word in title.split() if not word.startswith('#'))
-                
-                transcript = get_transcript(video_id)
-                
-                results.append({
-                    'Title': title_without_hashtags,
-                    'Hashtags': hashtags,
-                    'Video ID': video_id,
-                    'URL': f'https://youtube.com/shorts/{video_id}',
-                    'Transcript': clean_text(transcript),
-                    'Channel Name': channel_info['name'] if channel_info else '',
-                    'Channel Description': channel_info['description'] if channel_info else '',
-                    'Channel Image URL': channel_info['profile_image'] if channel_info else ''
-                })
+            # Fetch transcripts concurrently, keeping results in the original order
+            with ThreadPoolExecutor(max_workers=TRANSCRIPT_WORKERS) as executor:
+                futures = {executor.submit(get_transcript, video_ids[idx]): idx for idx in to_fetch}
+                for done, future in enumerate(as_completed(futures), 1):
+                    transcripts[futures[future]] = future.result()
+                    # Update progress
+                    progress = int(done * 100 / len(futures))
+                    progress_bar.progress(progress)
+                    status_text.text(f"Processing video {done} of {len(futures)}...")
+            progress_bar.progress(100)
+            
+            # Build the exported columns directly rather than a list of row dicts
+            titles, hashtags_col, urls, transcripts_col = [], [], [], []
+            
+            for item, video_id, transcript in zip(items, video_ids, transcripts):
+                title_without_hashtags, hashtags = split_hashtags(item['snippet']['title'])
+                titles.append(title_without_hashtags)
+                hashtags_col.append(hashtags)
+                urls.append(f'https://youtube.com/shorts/{video_id}')
+                transcripts_col.append(clean_text(transcript))
             
             # Create DataFrame with just video data
-            df = pd.DataFrame(results)[['Title', 'Hashtags', 'URL', 'Transcript']]
+            df = pd.DataFrame({'Title': titles, 'Hashtags': hashtags_col, 'URL': urls, 'Transcript': transcripts_col})
 
             # Get date range
-            start_date = pd.to_datetime(shorts_response['items'][-1]['snippet']['publishedAt']).strftime('%B %d, %Y')
-            end_date = pd.to_datetime(shorts_response['items'][0]['snippet']['publishedAt']).strftime('%B %d, %Y')
+            start_date = pd.to_datetime(items[-1]['snippet']['publishedAt']).strftime('%B %d, %Y')
+            end_date = pd.to_datetime(items[0]['snippet']['publishedAt']).strftime('%B %d, %Y')
             
             # Display channel information in a nice format
             st.markdown("---")
@@ -160,7 +241,7 @@ def main():
             with col2:
                 st.markdown(f"**Channel Name:** {channel_info['name']}")
                 st.markdown(f"**Date Range:** {start_date} - {end_date}")
-                st.markdown(f"**Videos Analyzed:** {len(results)}")
+                st.markdown(f"**Videos Analyzed:** {len(df)}")
                 with st.expander("Channel Description"):
                     st.write(channel_info['description'])
             
@@ -170,21 +251,19 @@ def main():
             # Display the simplified DataFrame
             st.dataframe(df)
             
-            # Create CSV with clean header format
-            csv_content = f"""{channel_info['name']}
-{start_date} - {end_date}
-Latest {len(results)} shorts
-
-{df.to_csv(index=False)}"""
+            # Create CSV with clean header format, writing header and rows into one buffer
+            csv_buffer = io.BytesIO()
+            csv_buffer.write(f"{channel_info['name']}\n{start_date} - {end_date}\nLatest {len(df)} shorts\n\n".encode('utf-8'))
+            df.to_csv(csv_buffer, index=False, encoding='utf-8')
             
             # Download button
             # Clean channel name for filename
-            safe_channel_name = re.sub(r'[^\w\-_]', '_', channel_info['name'])
+            safe_channel_name = _UNSAFE_FILENAME_RE.sub('_', channel_info['name'])
             filename = f"{safe_channel_name}_shorts_analysis.csv"
             
             st.download_button(
                 "Download CSV",
-                csv_content.encode('utf-8'),
+                csv_buffer.getvalue(),
                 filename,
                 "text/csv",
                 key='download-csv'
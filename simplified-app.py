@@ -1,13 +1,15 @@
 # app.py
 import streamlit as st
-from youtube_transcript_api import YouTubeTranscriptApi
+from transcripts import fetch_transcript
+from youtube_urls import extract_video_id
 import anthropic
-import urllib.parse
-import re
 
 # Initialize Anthropic client
 if 'client' not in st.session_state:
-    st.session_state.client = anthropic.Anthropic(api_key=st.secrets["anthropic_api_key"])
+    st.session_state.client = anthropic.Anthropic(
+        api_key=st.secrets["anthropic_api_key"],
+        default_headers={"anthropic-beta": "prompt-caching-2024-07-31"}
+    )
 
 # Initialize session states
 if 'transcript' not in st.session_state:
@@ -16,25 +18,16 @@ if 'ideas' not in st.session_state:
     st.session_state.ideas = None
 if 'selected_idea' not in st.session_state:
     st.session_state.selected_idea = None
+if 'direction' not in st.session_state:
+    st.session_state.direction = None  # Direction given for the first draft
 if 'current_script' not in st.session_state:
     st.session_state.current_script = None
 if 'revision_history' not in st.session_state:
     st.session_state.revision_history = []  # List of (script, feedback) tuples
 
-def extract_video_id(url):
-    """Extract video ID from YouTube URL"""
-    query = urllib.parse.urlparse(url)
-    if query.hostname == 'youtu.be':
-        return query.path[1:]
-    if query.hostname in {'www.youtube.com', 'youtube.com'}:
-        if query.path == '/watch':
-            return urllib.parse.parse_qs(query.query)['v'][0]
-    raise ValueError(f"Invalid YouTube URL: {url}")
-
 def get_transcript(video_id):
     """Get transcript for YouTube video"""
-    transcript_list = YouTubeTranscriptApi.get_transcript(video_id)
-    return ' '.join(entry['text'] for entry in transcript_list)
+    return fetch_transcript(video_id)
 
 def generate_ideas(transcript):
     """Generate three ideas based on transcript"""
@@ -53,27 +46,32 @@ def generate_ideas(transcript):
             ideas.append(line[5:].strip())
     return ideas[:3]
 
-def format_history(history):
-    """Format revision history for the model"""
-    formatted = ""
-    for i, (script, feedback) in enumerate(history, 1):
-        formatted += f"\nVERSION {i}:\n{script}\nFEEDBACK:\n{feedback}\n---"
-    return formatted
-
-def generate_script(transcript, idea, direction, current_script=None):
-    """Generate or revise script based on context"""
-    history = format_history(st.session_state.revision_history) if st.session_state.revision_history else ""
-    
-    if current_script and direction:
-        prompt = f"Revise this script based on the feedback and revision history:\n{history}\nCURRENT SCRIPT:\n{current_script}\nNEW FEEDBACK:\n{direction}"
-    else:
-        prompt = f"Create a 60-second video script about this AI development:\n\n{idea}\n\nDirection:\n{direction}\n\nContext:\n{transcript}"
+def build_script_messages(transcript, idea, direction, history):
+    """Build the script conversation: the original request, then each draft and its feedback"""
+    messages = [{
+        "role": "user",
+        "content": [{
+            "type": "text",
+            "text": f"Create a 60-second video script about this AI development:\n\n{idea}\n\nDirection:\n{direction}\n\nContext:\n{transcript}",
+            "cache_control": {"type": "ephemeral"}
+        }]
+    }]
+    for script, feedback in history:
+        messages.append({"role": "assistant", "content": script})
+        messages.append({"role": "user", "content": f"Revise this script based on the feedback:\n{feedback}"})
     
+    # Mark the latest turn too, so the next revision reuses the whole conversation so far
+    if history:
+        messages[-1]["content"] = [{"type": "text", "text": messages[-1]["content"], "cache_control": {"type": "ephemeral"}}]
+    return messages
+
+def generate_script(transcript, idea, direction, history):
+    """Generate the script, or revise it using the (script, feedback) pairs in history"""
     response = st.session_state.client.messages.create(
         model="claude-3-opus-20240229",
         max_tokens=1000,
         temperature=0.7,
-        messages=[{"role": "user", "content": prompt}]
+        messages=build_script_messages(transcript, idea, direction, history)
     )
     return response.content[0].text
 
@@ -116,8 +114,12 @@ if st.session_state.selected_idea:
             st.session_state.current_script = generate_script(
                 st.session_state.transcript,
                 st.session_state.selected_idea,
-                direction
+                direction,
+                []
             )
+            # Only start a new history once the first draft has come back
+            st.session_state.direction = direction
+            st.session_state.revision_history = []
 
 # Display and iterate on script
 if st.session_state.current_script:
@@ -129,14 +131,15 @@ if st.session_state.current_script:
     with col1:
         if st.button("Update Script"):
             with st.spinner("✨ Revising your script..."):
-                # Store current version before updating
-                st.session_state.revision_history.append((st.session_state.current_script, new_direction))
+                # Build the new history locally, so a failed call leaves the session untouched
+                revision_history = st.session_state.revision_history + [(st.session_state.current_script, new_direction)]
                 revised_script = generate_script(
                     st.session_state.transcript,
                     st.session_state.selected_idea,
-                    new_direction,
-                    st.session_state.current_script
+                    st.session_state.direction,
+                    revision_history
                 )
+                st.session_state.revision_history = revision_history
                 st.session_state.current_script = revised_script
                 st.rerun()
     with col2:
@@ -0,0 +1,22 @@
+from pathlib import Path
+import diskcache
+from youtube_transcript_api import YouTubeTranscriptApi
+
+# Transcripts never change for a given video, so keep them on disk across restarts
+# Anchored to this file, so every app shares one cache whatever directory it is launched from
+TRANSCRIPT_CACHE_DIR = Path(__file__).parent / ".transcript_cache"
+TRANSCRIPT_CACHE_EXPIRE = 30 * 86400
+
+_cache = diskcache.Cache(str(TRANSCRIPT_CACHE_DIR))
+
+def fetch_transcript(video_id: str, limiter=None) -> str:
+    """Get transcript text for a video, reading from and filling the on-disk cache"""
+    text = _cache.get(video_id)
+    if text is None:
+        # Only real fetches count against the limiter, and failures are left uncached
+        if limiter:
+            limiter.acquire()
+        transcript_list = YouTubeTranscriptApi.get_transcript(video_id)
+        text = ' '.join(entry['text'] for entry in transcript_list)
+        _cache.set(video_id, text, expire=TRANSCRIPT_CACHE_EXPIRE)
+    return text
@@ -0,0 +1,15 @@
+import re
+
+# Matches watch?v=, youtu.be/ and /shorts/ URLs on YouTube hosts only. Scheme and host are
+# case-insensitive, and the ID must not run on into more ID characters.
+_VIDEO_ID_RE = re.compile(
+    r'(?:https?://)?(?:(?:www\.|m\.)?youtube\.com/(?:watch\?(?:[^#]*&)?v=|shorts/)|youtu\.be/)([A-Za-z0-9_-]{11})(?![A-Za-z0-9_-])',
+    re.IGNORECASE
+)
+
+def extract_video_id(url: str) -> str:
+    """Extract video ID from YouTube URL"""
+    match = _VIDEO_ID_RE.match(url.strip())
+    if match:
+        return match.group(1)
+    raise ValueError(f"Invalid YouTube URL: {url}")